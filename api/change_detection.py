@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Change detection between generations of a user's financial data
+Hashes each section of the minimal format so unchanged data is not sent again
+"""
+
+import os
+import re
+import json
+import hashlib
+import tempfile
+from collections import Counter
+from typing import Dict, List, Any, Optional, Tuple
+
+# Sections of the minimal format that are versioned; metadata changes on every run and is not
+SECTIONS = {
+    "balance": "current_balance",
+    "transactions": "transactions",
+    "investments": "investments"
+}
+
+
+def _canonical(value: Any) -> bytes:
+    """Serialize a value deterministically for hashing"""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def section_hashes(minimal_data: Dict[str, Any]) -> Dict[str, str]:
+    """Get a stable content hash for each section
+
+    Transactions are hashed as a sorted multiset, matching transaction_delta: a client that
+    applies a delta's added/removed entries ends up with data that hashes to the new version.
+    """
+    hashes = {}
+    for section, key in SECTIONS.items():
+        value = minimal_data.get(key)
+        if section == "transactions":
+            payload = b"[" + b",".join(sorted(_canonical(t) for t in value or [])) + b"]"
+        else:
+            payload = _canonical(value)
+        hashes[section] = hashlib.sha256(payload).hexdigest()[:16]
+    return hashes
+
+
+def data_version(hashes: Dict[str, str]) -> str:
+    """Combine section hashes into one version string (the ETag)"""
+    combined = "".join(hashes[section] for section in SECTIONS)
+    return hashlib.sha256(combined.encode('utf-8')).hexdigest()[:16]
+
+
+def transaction_delta(old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Multiset difference between two minimal transaction lists"""
+    old_counts = Counter(_canonical(t) for t in old)
+    new_counts = Counter(_canonical(t) for t in new)
+    return {
+        "added": [json.loads(t) for t, n in (new_counts - old_counts).items() for _ in range(n)],
+        "removed": [json.loads(t) for t, n in (old_counts - new_counts).items() for _ in range(n)]
+    }
+
+
+class VersionStore:
+    """Remembers the last version sent to each user, one JSON file per user"""
+
+    def __init__(self, state_dir: str):
+        """Initialize store in the given directory"""
+        self.state_dir = state_dir
+
+    def _path(self, user_id: str) -> str:
+        """State file for a user"""
+        return os.path.join(self.state_dir, re.sub(r'[^A-Za-z0-9_.-]', '_', user_id) + ".json")
+
+    def load(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get the last sent version, its section hashes and transactions"""
+        path = self._path(user_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def save(self, user_id: str, version: str, hashes: Dict[str, str], transactions: List[Dict[str, Any]]):
+        """Record the version that was just sent"""
+        os.makedirs(self.state_dir, exist_ok=True)
+        path = self._path(user_id)
+        # A temp file per writer, so concurrent requests for one user can't replace each other's
+        handle, temp_path = tempfile.mkstemp(dir=self.state_dir, suffix=".tmp")
+        with os.fdopen(handle, 'w') as f:
+            json.dump({"version": version, "hashes": hashes, "transactions": transactions}, f,
+                      separators=(',', ':'), default=str)
+        os.replace(temp_path, path)
+
+
+def build_versioned_response(user_id: str, minimal_data: Dict[str, Any], store: VersionStore,
+                             known_versions: Optional[List[str]] = None
+                             ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """Build a not_modified, delta or full response relative to the versions the caller has
+
+    Also returns the state to record with store.save once the response has been delivered
+    (None when nothing new is sent), so a failed write can't leave the store ahead of the caller.
+    """
+    known_versions = known_versions or []
+    hashes = section_hashes(minimal_data)
+    version = data_version(hashes)
+
+    if version in known_versions:
+        return {"status": "not_modified", "version": version}, None
+
+    previous = store.load(user_id)
+    sent = {"version": version, "hashes": hashes, "transactions": minimal_data.get('transactions', [])}
+
+    # A delta is only possible against the exact version we last sent
+    if not previous or previous.get('version') not in known_versions:
+        return {"status": "full", "version": version, "data": minimal_data}, sent
+
+    changes: Dict[str, Any] = {}
+    for section, key in SECTIONS.items():
+        if hashes[section] == previous['hashes'].get(section):
+            continue
+        if section == "transactions":
+            delta = transaction_delta(previous.get('transactions', []), minimal_data.get('transactions', []))
+            # Fall back to the full list when the delta would not be smaller
+            if len(delta['added']) + len(delta['removed']) < len(minimal_data.get('transactions', [])):
+                changes["transactions_delta"] = delta
+                continue
+        changes[key] = minimal_data.get(key)
+
+    return {
+        "status": "delta",
+        "version": version,
+        "base_version": previous['version'],
+        "changes": changes,
+        "metadata": minimal_data.get('metadata', {})
+    }, sent
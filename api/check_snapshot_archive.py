@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Check that repeated archiving of overlapping generations reads back like the newest generation
+Archives small hand-written generations into a scratch directory and queries them back
+"""
+
+import sys
+import tempfile
+from typing import Dict, List, Any, Tuple
+
+from snapshot_archive import SnapshotArchive
+
+
+def generation(generated_at: str, transactions: List[Tuple[str, float, str]]) -> Dict[str, Any]:
+    """Build a raw dataset from (transaction_id, amount, date) tuples"""
+    return {
+        "accounts": [{"account_id": "a", "type": "depository", "balances": {"current": 100}}],
+        "transactions": [
+            {"transaction_id": transaction_id, "account_id": "a", "amount": amount, "date": day, "name": "Shop"}
+            for transaction_id, amount, day in transactions
+        ],
+        "metadata": {"generated_at": generated_at}
+    }
+
+
+def archived_ids(generations: List[Dict[str, Any]], start: str = "2026-09-01", end: str = "2026-10-31") -> List[str]:
+    """Archive generations in order and get the transaction ids a query returns"""
+    with tempfile.TemporaryDirectory() as root:
+        archive = SnapshotArchive(root)
+        for raw_data in generations:
+            archive.archive("u", raw_data)
+        return sorted(archive.query_transactions("u", start, end)['transaction_id'].to_pylist())
+
+
+def main():
+    """Run every scenario and report the ones that fail"""
+    scenarios = [
+        ("same generation archived twice", [
+            generation("2026-10-03T09:00:00", [("t1", 10, "2026-09-30"), ("t2", 5, "2026-10-02")]),
+            generation("2026-10-03T09:00:00", [("t1", 10, "2026-09-30"), ("t2", 5, "2026-10-02")])
+        ], ["t1", "t2"]),
+        ("new ids for the same transaction", [
+            generation("2026-10-03T09:00:00", [("x1", 10, "2026-10-02")]),
+            generation("2026-10-04T09:00:00", [("y1", 10, "2026-10-02")])
+        ], ["y1"]),
+        ("transaction dropped by a later generation", [
+            generation("2026-10-03T09:00:00", [("t1", 10, "2026-10-01"), ("t2", 5, "2026-10-02")]),
+            generation("2026-10-04T09:00:00", [("t1", 10, "2026-10-01")])
+        ], ["t1"]),
+        ("history before a later window is kept", [
+            generation("2026-10-03T09:00:00", [("t1", 10, "2026-09-05"), ("t2", 5, "2026-10-02")]),
+            generation("2026-10-20T09:00:00", [("t3", 7, "2026-09-25"), ("t4", 5, "2026-10-15")])
+        ], ["t1", "t3", "t4"])
+    ]
+
+    failures = 0
+    for name, generations, expected in scenarios:
+        ids = archived_ids(generations)
+        if ids != expected:
+            failures += 1
+            print(f"[ERROR] {name}: expected {expected}, got {ids}")
+        else:
+            print(f"[SUCCESS] {name}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,186 +5,88 @@ This script is called from the Next.js API route to generate user-specific data
 """
 
 import sys
-import json
+import argparse
 import os
-import random
-from datetime import datetime, timedelta
+from collections import Counter
+from datetime import datetime
 from plaid_client import PlaidClient
+from output_codecs import DEFAULT_CODEC, parse_codec, write_output
+from change_detection import VersionStore, build_versioned_response
+from incremental_aggregates import UserAggregateState, refresh, state_path
+from pipeline import stable_user_hash, raw_records, mock_records, tally, annotate, perturb, project, aggregate
+
+def save_output(user_id: str, transformed_data, output_file: str, codec: str = DEFAULT_CODEC,
+                state_dir: str = None, known_versions: list = None):
+    """Write transformed data, wrapped in a versioned response when state_dir is set"""
+    if not state_dir:
+        write_output(transformed_data, output_file, codec)
+        return
+    
+    store = VersionStore(state_dir)
+    response, sent = build_versioned_response(user_id, transformed_data, store, known_versions)
+    write_output(response, output_file, codec)
+    # Only remember the version once the caller can actually receive it
+    if sent:
+        store.save(user_id, **sent)
+    print(f"[INFO] Response: {response['status']} (version {response['version']})")
 
 def transform_to_minimal_format(raw_data):
     """Transform raw Plaid data to the minimal format expected by the API"""
-    
-    # Calculate total current balance from all accounts
-    total_balance = 0
-    for account in raw_data.get('accounts', []):
-        balance = account.get('balances', {}).get('current', 0)
-        # For credit cards, balance represents debt (negative)
-        if account.get('type') == 'credit':
-            total_balance -= balance
-        else:
-            total_balance += balance
-    
-    # Extract minimal transaction data (vendor and cash flow)
-    transactions = []
-    for transaction in raw_data.get('transactions', []):
-        merchant = transaction.get('merchant_name') or transaction.get('name', 'Unknown')
-        amount = transaction.get('amount', 0)
-        
-        # Determine cash flow: positive for income, negative for expenses
-        cash_flow = -amount  # Flip the sign to make expenses negative
-        
-        transactions.append({
-            "vendor": merchant,
-            "cash_flow": cash_flow
-        })
-    
-    # Extract minimal investment data
-    investments = []
-    securities = raw_data.get('securities', [])
-    for holding in raw_data.get('holdings', []):
-        security_id = holding.get('security_id')
-        security = next((s for s in securities if s.get('security_id') == security_id), {})
-        
-        symbol = security.get('ticker_symbol', 'N/A')
-        current_value = holding.get('institution_value', 0)
-        quantity = holding.get('quantity', 0)
-        
-        # Only include investments with actual value and valid symbol
-        if symbol != 'N/A' and current_value > 0:
-            investments.append({
-                "symbol": symbol,
-                "quantity": quantity,
-                "current_value": current_value
-            })
-    
-    return {
-        "current_balance": total_balance,
-        "transactions": transactions,
-        "investments": investments,
-        "metadata": raw_data.get('metadata', {})
+    return aggregate(project(raw_records(raw_data)))
+
+def transform_records(user_id: str, records, aggregate_dir: str = None, archive_dir: str = None):
+    """Transform raw records, updating the user's running aggregates when aggregate_dir is set
+    and archiving the raw records as one generation when archive_dir is set"""
+    if archive_dir:
+        # pyarrow is only needed when archiving
+        from snapshot_archive import SnapshotArchive, archive_records
+        records = archive_records(records, SnapshotArchive(archive_dir), user_id)
+    
+    if not aggregate_dir:
+        return aggregate(project(records))
+    
+    # Only what changed since the last refresh is applied to the stored aggregates
+    state_file = state_path(aggregate_dir, user_id)
+    state = UserAggregateState.load(state_file, user_id)
+    changes = Counter()
+    transformed_data = aggregate(project(refresh(records, state, changes)))
+    os.makedirs(aggregate_dir, exist_ok=True)
+    state.save(state_file)
+    
+    transformed_data['metadata']['aggregates'] = {
+        "income": state.income,
+        "expenses": state.expenses,
+        "net_cash_flow": state.net_cash_flow
     }
+    print(f"[INFO] Aggregates updated: {changes['changed']} changed, {changes['removed']} removed transactions")
+    return transformed_data
 
-def generate_mock_financial_data(user_id: str, output_file: str):
+def generate_mock_financial_data(user_id: str, output_file: str, codec: str = DEFAULT_CODEC,
+                                 state_dir: str = None, known_versions: list = None,
+                                 aggregate_dir: str = None, archive_dir: str = None):
     """Generate mock financial data when Plaid credentials are not available"""
     
     print(f"[INFO] Generating mock financial data for user: {user_id}")
     
-    # Use user_id as seed for consistent randomization
-    random.seed(hash(user_id))
-    
-    # Generate mock accounts
-    account_types = ['checking', 'savings', 'credit']
-    accounts = []
-    
-    for i, account_type in enumerate(account_types):
-        # Generate unique balance based on user_id
-        base_balance = random.uniform(1000, 50000)
-        account_id = f"mock_account_{i+1}_{hash(user_id) % 10000}"
-        
-        accounts.append({
-            "account_id": account_id,
-            "name": f"{account_type.title()} Account",
-            "type": account_type,
-            "subtype": "checking" if account_type == "checking" else "savings" if account_type == "savings" else "credit card",
-            "balances": {
-                "current": round(base_balance, 2),
-                "available": round(base_balance * 0.9, 2) if account_type != "credit" else round(base_balance * 0.8, 2)
-            }
-        })
-    
-    # Generate mock transactions
-    vendors = ["Starbucks", "Amazon", "Uber", "Netflix", "Spotify", "McDonald's", "Target", "Walmart", "Gas Station", "Restaurant"]
-    transactions = []
-    
-    for i in range(random.randint(10, 25)):
-        vendor = random.choice(vendors)
-        amount = round(random.uniform(5, 200), 2)
-        transaction_id = f"mock_transaction_{i+1}_{hash(user_id) % 10000}"
-        
-        transactions.append({
-            "transaction_id": transaction_id,
-            "account_id": random.choice(accounts)["account_id"],
-            "amount": amount,
-            "date": (datetime.now() - timedelta(days=random.randint(1, 30))).strftime("%Y-%m-%d"),
-            "name": vendor,
-            "merchant_name": vendor,
-            "category": ["Food and Drink", "Transportation", "Entertainment", "Shopping"][random.randint(0, 3)]
-        })
-    
-    # Generate mock holdings
-    holdings = []
-    securities = []
-    
-    stock_symbols = ["AAPL", "GOOGL", "MSFT", "TSLA", "AMZN", "META", "NVDA"]
-    
-    for i, symbol in enumerate(random.sample(stock_symbols, random.randint(3, 5))):
-        quantity = random.uniform(1, 100)
-        price = random.uniform(50, 500)
-        
-        securities.append({
-            "security_id": f"mock_security_{i+1}",
-            "isin": f"US{symbol}123456",
-            "cusip": f"{symbol}123456",
-            "sedol": f"{symbol}1234",
-            "institution_security_id": f"INST_{symbol}",
-            "institution_id": "mock_institution",
-            "proxy_security_id": None,
-            "name": f"{symbol} Inc.",
-            "ticker_symbol": symbol,
-            "is_cash_equivalent": False,
-            "type": "equity",
-            "close_price": price,
-            "close_price_as_of": datetime.now().strftime("%Y-%m-%d"),
-            "iso_currency_code": "USD",
-            "unofficial_currency_code": None
-        })
-        
-        holdings.append({
-            "account_id": random.choice(accounts)["account_id"],
-            "security_id": f"mock_security_{i+1}",
-            "institution_price": price,
-            "institution_price_as_of": datetime.now().strftime("%Y-%m-%d"),
-            "institution_value": round(quantity * price, 2),
-            "cost_basis": round(quantity * price * random.uniform(0.8, 1.2), 2),
-            "quantity": round(quantity, 4),
-            "iso_currency_code": "USD",
-            "unofficial_currency_code": None
-        })
-    
-    # Create financial data structure
-    financial_data = {
-        "accounts": accounts,
-        "transactions": transactions,
-        "holdings": holdings,
-        "securities": securities,
-        "investment_transactions": [],
-        "metadata": {
-            "user_id": user_id,
-            "generated_at": datetime.now().isoformat(),
-            "data_source": "mock_data",
-            "item_id": f"mock_item_{hash(user_id) % 10000}",
-            "total_accounts": len(accounts),
-            "total_transactions": len(transactions),
-            "total_holdings": len(holdings)
-        }
-    }
-    
-    # Transform to minimal format
-    transformed_data = transform_to_minimal_format(financial_data)
+    # Generate, project and collect mock records in a single pass
+    counts = Counter()
+    transformed_data = transform_records(user_id, tally(mock_records(user_id), counts),
+                                         aggregate_dir, archive_dir)
     
     # Save to file
-    with open(output_file, 'w') as f:
-        json.dump(transformed_data, f, indent=2, default=str)
+    save_output(user_id, transformed_data, output_file, codec, state_dir, known_versions)
     
     print(f"[SUCCESS] Mock financial data generated and saved to: {output_file}")
-    print(f"   Accounts: {len(accounts)}")
-    print(f"   Transactions: {len(transactions)}")
-    print(f"   Holdings: {len(holdings)}")
-    print(f"   Item ID: {financial_data['metadata']['item_id']}")
+    print(f"   Accounts: {counts['account']}")
+    print(f"   Transactions: {counts['transaction']}")
+    print(f"   Holdings: {counts['holding']}")
+    print(f"   Item ID: {transformed_data['metadata']['item_id']}")
     
     return True
 
-def generate_user_financial_data(user_id: str, output_file: str):
+def generate_user_financial_data(user_id: str, output_file: str, codec: str = DEFAULT_CODEC,
+                                 state_dir: str = None, known_versions: list = None,
+                                 aggregate_dir: str = None, archive_dir: str = None):
     """Generate unique financial data for a specific user"""
     
     print(f"[INFO] Generating financial data for user: {user_id}")
@@ -197,7 +99,8 @@ def generate_user_financial_data(user_id: str, output_file: str):
         except ValueError as e:
             print(f"[WARNING] Plaid credentials not configured: {str(e)}")
             print("[INFO] Generating mock financial data instead...")
-            return generate_mock_financial_data(user_id, output_file)
+            return generate_mock_financial_data(user_id, output_file, codec, state_dir, known_versions,
+                                                aggregate_dir, archive_dir)
         
         # Generate unique sandbox data
         print("[INFO] Fetching unique sandbox data from Plaid...")
@@ -206,43 +109,23 @@ def generate_user_financial_data(user_id: str, output_file: str):
         if 'error' in financial_data:
             print(f"[ERROR] Error fetching data: {financial_data['error']}")
             print("[INFO] Falling back to mock data...")
-            return generate_mock_financial_data(user_id, output_file)
+            return generate_mock_financial_data(user_id, output_file, codec, state_dir, known_versions,
+                                                aggregate_dir, archive_dir)
         
-        # Add user-specific metadata
+        # Add user-specific metadata and per-user variation (seeded by user_id for
+        # consistent randomization), then transform, all in one pass over the records
         financial_data['metadata'] = financial_data.get('metadata', {})
-        financial_data['metadata']['user_id'] = user_id
-        financial_data['metadata']['generated_at'] = datetime.now().isoformat()
-        financial_data['metadata']['unique_session'] = f"{user_id}_{datetime.now().timestamp()}"
-        
-        # Add some randomization to make data unique per user
-        import random
-        random.seed(hash(user_id))  # Use user_id as seed for consistent randomization
-        
-        # Modify transaction amounts slightly based on user_id
-        for transaction in financial_data.get('transactions', []):
-            if 'amount' in transaction:
-                # Add small random variation based on user_id
-                variation = random.uniform(0.95, 1.05)
-                transaction['amount'] = round(transaction['amount'] * variation, 2)
-        
-        # Modify account balances slightly
-        for account in financial_data.get('accounts', []):
-            if 'balances' in account and 'current' in account['balances']:
-                variation = random.uniform(0.98, 1.02)
-                account['balances']['current'] = round(account['balances']['current'] * variation, 2)
-        
-        # Modify investment values
-        for holding in financial_data.get('holdings', []):
-            if 'quantity' in holding and 'institution_price' in holding:
-                variation = random.uniform(0.99, 1.01)
-                holding['institution_price'] = round(holding['institution_price'] * variation, 2)
-        
-        # Transform data to the expected format
-        transformed_data = transform_to_minimal_format(financial_data)
+        records = annotate(
+            raw_records(financial_data),
+            user_id=user_id,
+            generated_at=datetime.now().isoformat(),
+            unique_session=f"{user_id}_{datetime.now().timestamp()}"
+        )
+        transformed_data = transform_records(user_id, perturb(records, stable_user_hash(user_id)),
+                                             aggregate_dir, archive_dir)
         
         # Save to file
-        with open(output_file, 'w') as f:
-            json.dump(transformed_data, f, indent=2, default=str)
+        save_output(user_id, transformed_data, output_file, codec, state_dir, known_versions)
         
         print(f"[SUCCESS] Financial data generated and saved to: {output_file}")
         print(f"   Accounts: {len(financial_data.get('accounts', []))}")
@@ -258,14 +141,30 @@ def generate_user_financial_data(user_id: str, output_file: str):
 
 def main():
     """Main function called from Next.js API"""
-    if len(sys.argv) != 3:
-        print("Usage: python generate_user_financial_data.py <user_id> <output_file>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Generate financial data for a user")
+    parser.add_argument("user_id")
+    parser.add_argument("output_file")
+    parser.add_argument("--format", dest="codec", default=DEFAULT_CODEC,
+                        help="Output codec: json, compact-json or msgpack, optionally +gzip or +zstd (default: json)")
+    parser.add_argument("--state-dir", default=None,
+                        help="Directory remembering the last version sent per user; enables versioned responses")
+    parser.add_argument("--known-version", dest="known_versions", action="append", default=[],
+                        help="Version the caller already has (repeatable); unchanged data yields a not_modified response")
+    parser.add_argument("--aggregate-dir", default=None,
+                        help="Directory holding running per-user aggregates, updated with what changed")
+    parser.add_argument("--archive-dir", default=None,
+                        help="Columnar archive that keeps every generation's raw data for history queries")
+    args = parser.parse_args()
     
-    user_id = sys.argv[1]
-    output_file = sys.argv[2]
+    try:
+        parse_codec(args.codec)
+    except ValueError as e:
+        print(f"[ERROR] {str(e)}")
+        sys.exit(1)
     
-    success = generate_user_financial_data(user_id, output_file)
+    success = generate_user_financial_data(args.user_id, args.output_file, args.codec,
+                                           args.state_dir, args.known_versions,
+                                           args.aggregate_dir, args.archive_dir)
     
     if success:
         print("[SUCCESS] Financial data generation completed successfully")
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Incremental balance and cash-flow aggregation for user data refreshes
+Applies transaction and account deltas in O(delta) instead of recomputing from scratch
+"""
+
+import sys
+import json
+import os
+import re
+import tempfile
+from collections import Counter
+from typing import Dict, List, Any, Iterable, Iterator
+
+from pipeline import Record, raw_records, project, aggregate
+
+# Aggregates are money values, so compare them to the cent
+TOLERANCE = 0.005
+
+
+def _signed_balance(account: Dict[str, Any]) -> float:
+    """Get an account's contribution to the total balance (credit is debt)"""
+    balance = account.get('balances', {}).get('current', 0) or 0
+    return -balance if account.get('type') == 'credit' else balance
+
+
+def project_transaction(transaction: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a raw transaction to the fields the aggregates depend on"""
+    return {
+        "account_id": transaction.get('account_id'),
+        "vendor": transaction.get('merchant_name') or transaction.get('name', 'Unknown'),
+        "cash_flow": -transaction.get('amount', 0)
+    }
+
+
+class UserAggregateState:
+    """Running per-user aggregates kept between data refreshes"""
+
+    def __init__(self, user_id: str):
+        """Initialize empty state for a user"""
+        self.user_id = user_id
+        self.balance = 0.0
+        self.account_balances: Dict[str, float] = {}
+        self.account_totals: Dict[str, float] = {}
+        self.income = 0.0
+        self.expenses = 0.0
+        # transaction_id -> minimal record, so modifications and removals can be undone
+        self.transactions: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def net_cash_flow(self) -> float:
+        """Income minus expenses over all tracked transactions"""
+        return round(self.income + self.expenses, 2)
+
+    def _add_cash_flow(self, account_id: str, cash_flow: float, sign: int = 1):
+        """Add (sign=1) or retract (sign=-1) one transaction's cash flow"""
+        delta = sign * cash_flow
+        self.account_totals[account_id] = round(self.account_totals.get(account_id, 0) + delta, 2)
+        if cash_flow > 0:
+            self.income = round(self.income + delta, 2)
+        else:
+            self.expenses = round(self.expenses + delta, 2)
+
+    def apply_transactions(self, added: List[Dict[str, Any]] = None,
+                           modified: List[Dict[str, Any]] = None,
+                           removed: List[Any] = None):
+        """Apply a transactions delta shaped like Plaid's /transactions/sync response"""
+        for transaction in (added or []) + (modified or []):
+            transaction_id = transaction.get('transaction_id')
+            # A re-sent or modified transaction replaces what we already counted
+            self._remove_transaction(transaction_id)
+
+            record = project_transaction(transaction)
+            self.transactions[transaction_id] = record
+            self._add_cash_flow(record['account_id'], record['cash_flow'])
+
+        for transaction in removed or []:
+            # Plaid sends removed entries as {"transaction_id": ...}; accept bare ids too
+            transaction_id = transaction.get('transaction_id') if isinstance(transaction, dict) else transaction
+            self._remove_transaction(transaction_id)
+
+    def _remove_transaction(self, transaction_id: str):
+        """Retract a previously applied transaction, if any"""
+        record = self.transactions.pop(transaction_id, None)
+        if record is not None:
+            self._add_cash_flow(record['account_id'], record['cash_flow'], sign=-1)
+
+    def apply_account_updates(self, accounts: List[Dict[str, Any]]):
+        """Apply new balances for the given accounts"""
+        for account in accounts:
+            account_id = account.get('account_id')
+            new_balance = _signed_balance(account)
+            old_balance = self.account_balances.get(account_id, 0)
+            self.account_balances[account_id] = new_balance
+            self.balance = round(self.balance + new_balance - old_balance, 2)
+
+    def remove_accounts(self, account_ids: List[str]):
+        """Drop closed or unlinked accounts from the balance"""
+        for account_id in account_ids:
+            self.balance = round(self.balance - self.account_balances.pop(account_id, 0), 2)
+
+    def to_minimal_format(self) -> Dict[str, Any]:
+        """Get the balance and transactions in the minimal API format"""
+        return {
+            "current_balance": self.balance,
+            "transactions": [
+                {"vendor": t['vendor'], "cash_flow": t['cash_flow']}
+                for t in self.transactions.values()
+            ]
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize state for persistence"""
+        return {
+            "user_id": self.user_id,
+            "balance": self.balance,
+            "account_balances": self.account_balances,
+            "account_totals": self.account_totals,
+            "income": self.income,
+            "expenses": self.expenses,
+            "transactions": self.transactions
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'UserAggregateState':
+        """Restore state from its serialized form"""
+        state = cls(data['user_id'])
+        state.balance = data.get('balance', 0.0)
+        state.account_balances = data.get('account_balances', {})
+        state.account_totals = data.get('account_totals', {})
+        state.income = data.get('income', 0.0)
+        state.expenses = data.get('expenses', 0.0)
+        state.transactions = data.get('transactions', {})
+        return state
+
+    def save(self, filename: str):
+        """Persist state to a JSON file, replacing it atomically"""
+        # A temp file per writer, so concurrent refreshes of one user can't replace each other's
+        handle, temp_file = tempfile.mkstemp(dir=os.path.dirname(filename) or '.', suffix=".tmp")
+        with os.fdopen(handle, 'w') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+        os.replace(temp_file, filename)
+
+    @classmethod
+    def load(cls, filename: str, user_id: str) -> 'UserAggregateState':
+        """Load persisted state, or start fresh if there is none"""
+        if not os.path.exists(filename):
+            return cls(user_id)
+        with open(filename, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+
+def state_path(aggregate_dir: str, user_id: str) -> str:
+    """State file for a user inside an aggregate directory"""
+    return os.path.join(aggregate_dir, re.sub(r'[^A-Za-z0-9_.-]', '_', user_id) + ".json")
+
+
+def refresh(records: Iterable[Record], state: UserAggregateState, changes: Counter) -> Iterator[Record]:
+    """Pass raw records through, applying whatever changed to the state as they stream by
+
+    Only changed transactions and accounts touch the aggregates. Anything the state holds that
+    did not appear in the stream is removed once the stream ends, so consume it fully.
+    """
+    seen_transactions = set()
+    seen_accounts = set()
+    for kind, record in records:
+        if kind == "transaction":
+            transaction_id = record.get('transaction_id')
+            seen_transactions.add(transaction_id)
+            # Account, vendor and amount all feed the aggregates, so any of them counts as a change
+            if state.transactions.get(transaction_id) != project_transaction(record):
+                state.apply_transactions(modified=[record])
+                changes['changed'] += 1
+        elif kind == "account":
+            seen_accounts.add(record.get('account_id'))
+            state.apply_account_updates([record])
+        yield kind, record
+
+    removed = [transaction_id for transaction_id in state.transactions if transaction_id not in seen_transactions]
+    state.apply_transactions(removed=removed)
+    changes['removed'] += len(removed)
+    state.remove_accounts([account_id for account_id in state.account_balances if account_id not in seen_accounts])
+
+
+def build_state(user_id: str, raw_data: Dict[str, Any]) -> UserAggregateState:
+    """Build state from a full raw Plaid dataset (first run)"""
+    state = UserAggregateState(user_id)
+    state.apply_account_updates(raw_data.get('accounts', []))
+    state.apply_transactions(added=raw_data.get('transactions', []))
+    return state
+
+
+def check_consistency(state: UserAggregateState, raw_data: Dict[str, Any]) -> List[str]:
+    """Compare incremental state with a full recompute; returns a list of mismatches"""
+    expected = aggregate(project(raw_records(raw_data)))
+    problems = []
+
+    if abs(state.balance - expected['current_balance']) > TOLERANCE:
+        problems.append(f"current_balance: incremental={state.balance} full={expected['current_balance']}")
+
+    expected_transactions = Counter((t['vendor'], round(t['cash_flow'], 2)) for t in expected['transactions'])
+    actual_transactions = Counter((t['vendor'], round(t['cash_flow'], 2)) for t in state.transactions.values())
+    if expected_transactions != actual_transactions:
+        missing = sum((expected_transactions - actual_transactions).values())
+        extra = sum((actual_transactions - expected_transactions).values())
+        problems.append(f"transactions: incremental is missing {missing} and has {extra} extra (vendor, cash_flow) entries")
+
+    expected_net = round(sum(t['cash_flow'] for t in expected['transactions']), 2)
+    if abs(state.net_cash_flow - expected_net) > TOLERANCE:
+        problems.append(f"net_cash_flow: incremental={state.net_cash_flow} full={round(expected_net, 2)}")
+
+    expected_totals: Dict[str, float] = {}
+    for transaction in raw_data.get('transactions', []):
+        account_id = transaction.get('account_id')
+        expected_totals[account_id] = expected_totals.get(account_id, 0) - transaction.get('amount', 0)
+    for account_id in set(expected_totals) | set(state.account_totals):
+        actual = state.account_totals.get(account_id, 0)
+        full = expected_totals.get(account_id, 0)
+        if abs(actual - round(full, 2)) > TOLERANCE:
+            problems.append(f"account_totals[{account_id}]: incremental={actual} full={round(full, 2)}")
+
+    return problems
+
+
+def main():
+    """Build or refresh a user's aggregate state from a raw data file and verify it"""
+    if len(sys.argv) != 4:
+        print("Usage: python incremental_aggregates.py <user_id> <raw_data_file> <state_file>")
+        sys.exit(1)
+
+    user_id, raw_file, state_file = sys.argv[1], sys.argv[2], sys.argv[3]
+
+    with open(raw_file, 'r') as f:
+        raw_data = json.load(f)
+
+    state = UserAggregateState.load(state_file, user_id)
+    if state.transactions or state.account_balances:
+        # Diff the new dataset against what the state already holds
+        changes = Counter()
+        for _ in refresh(raw_records(raw_data), state, changes):
+            pass
+        print(f"[INFO] Applied delta: {changes['changed']} changed, {changes['removed']} removed transactions")
+    else:
+        state = build_state(user_id, raw_data)
+        print(f"[INFO] Built initial state with {len(state.transactions)} transactions")
+
+    state.save(state_file)
+
+    problems = check_consistency(state, raw_data)
+    if problems:
+        print("[ERROR] Incremental state does not match full recompute:")
+        for problem in problems:
+            print(f"   {problem}")
+        sys.exit(1)
+
+    print(f"[SUCCESS] State consistent. Balance: ${state.balance:,.2f}, Net cash flow: ${state.net_cash_flow:,.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Concurrent load test for the financial data generation pipeline
+Drives generate_user_financial_data either the way the Next.js route does (one Python
+process per request) or in-process, against mock data or the local Plaid stand-in
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+
+import psutil
+
+from output_codecs import decode
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+GENERATOR_SCRIPT = os.path.join(API_DIR, "generate_user_financial_data.py")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class ResourceSampler:
+    """Samples CPU and RSS of this process and its children on a background thread"""
+
+    def __init__(self, interval: float = 1.0):
+        """Initialize sampler with the sampling interval in seconds"""
+        self.interval = interval
+        self.samples: List[Dict[str, float]] = []
+        self.process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def _cpu_seconds() -> float:
+        """CPU time used by this process and every child it has reaped"""
+        times = os.times()
+        return times.user + times.system + times.children_user + times.children_system
+
+    def _run(self):
+        start = time.perf_counter()
+        last_time, last_cpu = start, self._cpu_seconds()
+        while not self._stop.wait(self.interval):
+            now, cpu = time.perf_counter(), self._cpu_seconds()
+            rss = 0
+            processes = [self.process]
+            try:
+                processes += self.process.children(recursive=True)
+            except psutil.Error:
+                pass
+            for proc in processes:
+                try:
+                    rss += proc.memory_info().rss
+                except psutil.Error:
+                    continue
+            self.samples.append({
+                "t": round(now - start, 2),
+                # Short-lived generator processes are only counted once they exit and are reaped
+                "cpu_percent": round((cpu - last_cpu) / (now - last_time) * 100, 1),
+                "rss_mb": round(rss / (1024 * 1024), 1),
+                "processes": len(processes)
+            })
+            last_time, last_cpu = now, cpu
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+class LoadTest:
+    """Issues generation requests at a target concurrency and arrival rate"""
+
+    def __init__(self, mode: str = "subprocess", users: int = 100, concurrency: int = 10,
+                 rate: float = 0.0, codec: str = "compact-json", env: Optional[Dict[str, str]] = None,
+                 expect_plaid: bool = False, work_dir: Optional[str] = None):
+        """Initialize load test
+
+        mode: "subprocess" spawns the generator per request like the route; "inprocess" calls it directly
+        rate: arrivals per second (open loop); 0 means each worker issues requests back to back
+        expect_plaid: count output that fell back to mock data as a failure
+        work_dir: where the generator keeps versions, aggregates and the archive, as the route has it
+        under api/; None skips that state entirely
+        """
+        self.mode = mode
+        self.user_ids = [f"loadtest_user_{i}" for i in range(users)]
+        self.concurrency = concurrency
+        self.rate = rate
+        self.codec = codec
+        self.env = env or {}
+        self.expect_plaid = expect_plaid
+        self.generator_dirs: Dict[str, str] = {}
+        if work_dir:
+            self.generator_dirs = {
+                "state_dir": os.path.join(work_dir, "versions"),
+                "aggregate_dir": os.path.join(work_dir, "aggregates"),
+                "archive_dir": os.path.join(work_dir, "archive")
+            }
+        self.results: List[Dict[str, Any]] = []
+        self.lock = threading.Lock()
+        self._generate = None
+
+        if mode == "inprocess":
+            # Environment must be in place before plaid_client reads it at import time
+            os.environ.update(self.env)
+            sys.path.insert(0, API_DIR)
+            from generate_user_financial_data import generate_user_financial_data
+            self._generate = generate_user_financial_data
+
+    def _run_one(self, user_id: str) -> Optional[str]:
+        """Generate data for one user like the route does; returns an error message or None"""
+        handle, output_file = tempfile.mkstemp(prefix=f"{user_id}_", suffix=".out")
+        os.close(handle)
+        try:
+            if self.mode == "subprocess":
+                args = [sys.executable, GENERATOR_SCRIPT, user_id, output_file, "--format", self.codec]
+                for name, directory in self.generator_dirs.items():
+                    args += [f"--{name.replace('_', '-')}", directory]
+                completed = subprocess.run(
+                    args, cwd=API_DIR, env={**os.environ, **self.env},
+                    stdout=subprocess.PIPE, stderr=subprocess.PIPE
+                )
+                if completed.returncode != 0:
+                    return (completed.stderr or completed.stdout).decode('utf-8', 'replace').strip()[-200:] or \
+                        f"exit code {completed.returncode}"
+            else:
+                if not self._generate(user_id, output_file, self.codec, **self.generator_dirs):
+                    return "generator returned failure"
+
+            # The route reads the file back before deleting it
+            with open(output_file, 'rb') as f:
+                payload = f.read()
+            if not payload:
+                return "empty output"
+
+            # Plaid failures don't fail the generator: it falls back to mock data, or leaves
+            # a section empty and notes it in metadata, so they only show up in the output
+            output = decode(payload, self.codec)
+            # Versioned responses nest full data under "data"; deltas carry metadata at the top
+            metadata = output.get('data', output).get('metadata', {})
+            if self.expect_plaid and metadata.get('data_source') == "mock_data":
+                return "fell back to mock data"
+            if metadata.get('partial_errors'):
+                return f"partial data, failed sections: {', '.join(sorted(metadata['partial_errors']))}"
+            return None
+        except Exception as e:
+            return str(e)
+        finally:
+            if os.path.exists(output_file):
+                os.unlink(output_file)
+
+    def _record(self, user_id: str, scheduled: float):
+        started = time.perf_counter()
+        error = self._run_one(user_id)
+        finished = time.perf_counter()
+        with self.lock:
+            self.results.append({
+                "finished": finished,
+                # Latency counts time spent queued behind busy workers, as a caller would see it
+                "latency": finished - scheduled,
+                "service_time": finished - started,
+                "error": error
+            })
+
+    def run(self, duration: float) -> float:
+        """Run for the given number of seconds; returns the elapsed wall time"""
+        rng = random.Random(0)
+        start = time.perf_counter()
+        deadline = start + duration
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            if self.rate > 0:
+                # Poisson arrivals, independent of how fast requests complete
+                next_arrival = start
+                while True:
+                    next_arrival += rng.expovariate(self.rate)
+                    if next_arrival >= deadline:
+                        break
+                    time.sleep(max(0.0, next_arrival - time.perf_counter()))
+                    pool.submit(self._record, rng.choice(self.user_ids), next_arrival)
+            else:
+                def worker(seed: int):
+                    worker_rng = random.Random(seed)
+                    while time.perf_counter() < deadline:
+                        self._record(worker_rng.choice(self.user_ids), time.perf_counter())
+                for i in range(self.concurrency):
+                    pool.submit(worker, i)
+
+        return time.perf_counter() - start
+
+    def report(self, elapsed: float, samples: List[Dict[str, float]]) -> Dict[str, Any]:
+        """Summarize throughput, latency percentiles, errors and resource usage"""
+        latencies = [r["latency"] * 1000 for r in self.results if r["error"] is None]
+        errors = [r["error"] for r in self.results if r["error"] is not None]
+        error_counts: Dict[str, int] = {}
+        for error in errors:
+            key = error.splitlines()[-1][:120] if error else "unknown"
+            error_counts[key] = error_counts.get(key, 0) + 1
+
+        return {
+            "mode": self.mode,
+            "concurrency": self.concurrency,
+            "target_rate": self.rate,
+            "elapsed_s": round(elapsed, 2),
+            "requests": len(self.results),
+            "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(len(errors) / len(self.results), 4) if self.results else 0.0,
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50), 1),
+                "p95": round(percentile(latencies, 95), 1),
+                "p99": round(percentile(latencies, 99), 1),
+                "max": round(max(latencies), 1) if latencies else 0.0
+            },
+            "mean_service_ms": round(sum(r["service_time"] for r in self.results) / len(self.results) * 1000, 1)
+            if self.results else 0.0,
+            "errors": error_counts,
+            "resources": samples
+        }
+
+
+def print_report(report: Dict[str, Any]):
+    """Print a load test report"""
+    latency = report["latency_ms"]
+    print(f"\n[INFO] Load test results ({report['mode']}, concurrency {report['concurrency']}, "
+          f"rate {report['target_rate'] or 'closed loop'})")
+    print(f"   Requests: {report['requests']} in {report['elapsed_s']} s")
+    print(f"   Throughput: {report['throughput_rps']} req/s")
+    print(f"   Error rate: {report['error_rate'] * 100:.2f}%")
+    print(f"   Latency p50/p95/p99/max: {latency['p50']} / {latency['p95']} / {latency['p99']} / {latency['max']} ms")
+    print(f"   Mean service time: {report['mean_service_ms']} ms")
+    for error, count in report["errors"].items():
+        print(f"   Error x{count}: {error}")
+
+    if report["resources"]:
+        print(f"\n   {'t (s)':>7} {'cpu %':>8} {'rss MB':>9} {'procs':>6}")
+        for sample in report["resources"]:
+            print(f"   {sample['t']:>7} {sample['cpu_percent']:>8} {sample['rss_mb']:>9} {sample['processes']:>6}")
+
+
+def main():
+    """Run a load test from the command line"""
+    parser = argparse.ArgumentParser(description="Load test the financial data generator")
+    parser.add_argument("--mode", choices=["subprocess", "inprocess"], default="subprocess",
+                        help="subprocess spawns the generator per request like the Next.js route (default)")
+    parser.add_argument("--backend", choices=["mock", "standin"], default="mock",
+                        help="mock data, or a local Plaid stand-in started by this tool")
+    parser.add_argument("--users", type=int, default=100, help="Number of distinct user ids")
+    parser.add_argument("--concurrency", type=int, default=10, help="Maximum requests in flight")
+    parser.add_argument("--rate", type=float, default=0.0, help="Arrivals per second; 0 for closed loop")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to generate load")
+    parser.add_argument("--format", dest="codec", default="compact-json",
+                        help="Output codec passed to the generator (default: compact-json, as the route uses)")
+    parser.add_argument("--work-dir", default=None,
+                        help="Directory for generator versions, aggregates and archive (default: a scratch directory)")
+    parser.add_argument("--no-state", action="store_true",
+                        help="Run the generator without the state directories the route passes")
+    parser.add_argument("--standin-latency-ms", type=float, default=50.0, help="Mean stand-in response latency")
+    parser.add_argument("--standin-error-rate", type=float, default=0.0, help="Fraction of stand-in calls that fail")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Seconds between CPU/RSS samples")
+    parser.add_argument("--json-out", default=None, help="Also write the full report to this file")
+    args = parser.parse_args()
+
+    if args.backend == "mock":
+        # Empty credentials make the generator fall back to mock data
+        env = {"PLAID_CLIENT_ID": "", "PLAID_SECRET": ""}
+    else:
+        from plaid_standin import PlaidStandin, start_in_background
+        server = start_in_background(PlaidStandin(latency_ms=args.standin_latency_ms,
+                                                  error_rate=args.standin_error_rate))
+        env = {
+            "PLAID_HOST": f"http://127.0.0.1:{server.server_port}",
+            "PLAID_CLIENT_ID": "standin",
+            "PLAID_SECRET": "standin",
+            "PLAID_ENV": "sandbox"
+        }
+        print(f"[INFO] Plaid stand-in running at {env['PLAID_HOST']}")
+
+    scratch = None
+    work_dir = None
+    if not args.no_state:
+        if args.work_dir is None:
+            scratch = tempfile.TemporaryDirectory(prefix="loadtest_")
+        work_dir = args.work_dir or scratch.name
+
+    load_test = LoadTest(args.mode, args.users, args.concurrency, args.rate, args.codec, env,
+                         expect_plaid=args.backend == "standin", work_dir=work_dir)
+    sampler = ResourceSampler(args.sample_interval)
+
+    print(f"[INFO] Running {args.mode} load test against {args.backend} for {args.duration:.0f} s...")
+    sampler.start()
+    real_stdout = sys.stdout
+    if args.mode == "inprocess":
+        # The generator prints progress for every request
+        sys.stdout = open(os.devnull, 'w')
+    try:
+        elapsed = load_test.run(args.duration)
+    finally:
+        if sys.stdout is not real_stdout:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+        sampler.stop()
+        if scratch is not None:
+            scratch.cleanup()
+
+    report = load_test.report(elapsed, sampler.samples)
+    print_report(report)
+
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n[SUCCESS] Report saved to: {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
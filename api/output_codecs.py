@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Output codecs for generated financial data
+Codecs are named "<format>[+<compression>]", e.g. "json", "compact-json+gzip", "msgpack+zstd"
+"""
+
+import sys
+import json
+import gzip
+import time
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Any, Callable, Tuple
+
+# The original output: pretty-printed JSON the Node route can read directly
+DEFAULT_CODEC = "json"
+
+FORMATS = ["json", "compact-json", "msgpack"]
+COMPRESSIONS = ["gzip", "zstd"]
+
+
+def _encode_json(data: Any) -> bytes:
+    return json.dumps(data, indent=2, default=str).encode('utf-8')
+
+
+def _encode_compact_json(data: Any) -> bytes:
+    return json.dumps(data, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def _decode_json(payload: bytes) -> Any:
+    return json.loads(payload)
+
+
+def _encode_msgpack(data: Any) -> bytes:
+    import msgpack
+    # Same fallback as json's default=str, so dates and Plaid enums survive
+    return msgpack.packb(data, default=str, use_bin_type=True)
+
+
+def _decode_msgpack(payload: bytes) -> Any:
+    import msgpack
+    return msgpack.unpackb(payload, raw=False)
+
+
+def _zstd_compress(payload: bytes) -> bytes:
+    import zstandard
+    return zstandard.ZstdCompressor(level=3).compress(payload)
+
+
+def _zstd_decompress(payload: bytes) -> bytes:
+    import zstandard
+    return zstandard.ZstdDecompressor().decompress(payload)
+
+
+_FORMAT_HANDLERS: Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    "json": (_encode_json, _decode_json),
+    "compact-json": (_encode_compact_json, _decode_json),
+    "msgpack": (_encode_msgpack, _decode_msgpack)
+}
+
+_COMPRESSION_HANDLERS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "gzip": (lambda payload: gzip.compress(payload, compresslevel=6), gzip.decompress),
+    "zstd": (_zstd_compress, _zstd_decompress)
+}
+
+
+def parse_codec(codec: str) -> Tuple[str, str]:
+    """Split a codec name into (format, compression); compression may be ''"""
+    data_format, _, compression = codec.partition('+')
+    if data_format not in _FORMAT_HANDLERS:
+        raise ValueError(f"Unknown output format '{data_format}'. Choose from: {', '.join(FORMATS)}")
+    if compression and compression not in _COMPRESSION_HANDLERS:
+        raise ValueError(f"Unknown compression '{compression}'. Choose from: {', '.join(COMPRESSIONS)}")
+    return data_format, compression
+
+
+def encode(data: Any, codec: str = DEFAULT_CODEC) -> bytes:
+    """Encode data with the given codec"""
+    data_format, compression = parse_codec(codec)
+    payload = _FORMAT_HANDLERS[data_format][0](data)
+    if compression:
+        payload = _COMPRESSION_HANDLERS[compression][0](payload)
+    return payload
+
+
+def decode(payload: bytes, codec: str = DEFAULT_CODEC) -> Any:
+    """Decode data written with the given codec"""
+    data_format, compression = parse_codec(codec)
+    if compression:
+        payload = _COMPRESSION_HANDLERS[compression][1](payload)
+    return _FORMAT_HANDLERS[data_format][1](payload)
+
+
+def write_output(data: Any, output_file: str, codec: str = DEFAULT_CODEC):
+    """Encode data and write it to a file"""
+    payload = encode(data, codec)
+    with open(output_file, 'wb') as f:
+        f.write(payload)
+
+
+def read_output(input_file: str, codec: str = DEFAULT_CODEC) -> Any:
+    """Read a file written by write_output"""
+    with open(input_file, 'rb') as f:
+        return decode(f.read(), codec)
+
+
+def all_codecs():
+    """Every format/compression combination"""
+    for data_format in FORMATS:
+        yield data_format
+        for compression in COMPRESSIONS:
+            yield f"{data_format}+{compression}"
+
+
+def _large_history(transaction_count: int) -> Dict[str, Any]:
+    """Build a minimal-format payload with a long transaction history"""
+    rng = random.Random(0)
+    vendors = ["Starbucks", "Amazon", "Uber", "Netflix", "Spotify", "McDonald's", "Target", "Walmart"]
+    today = datetime.now()
+    return {
+        "current_balance": 12345.67,
+        "transactions": [
+            {
+                "vendor": rng.choice(vendors),
+                "cash_flow": -round(rng.uniform(5, 200), 2),
+                "date": (today - timedelta(days=rng.randint(1, 730))).strftime("%Y-%m-%d")
+            }
+            for _ in range(transaction_count)
+        ],
+        "investments": [
+            {"symbol": symbol, "quantity": round(rng.uniform(1, 100), 4), "current_value": round(rng.uniform(100, 20000), 2)}
+            for symbol in ["AAPL", "GOOGL", "MSFT", "TSLA", "AMZN"]
+        ],
+        "metadata": {"user_id": "benchmark", "generated_at": today.isoformat(), "data_source": "benchmark"}
+    }
+
+
+def benchmark(data: Dict[str, Any], repeat: int = 5):
+    """Compare encoded size, encode time and decode time across codecs"""
+    baseline = None
+    print(f"{'codec':<22} {'bytes':>10} {'ratio':>7} {'encode ms':>10} {'decode ms':>10}")
+    for codec in all_codecs():
+        try:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                payload = encode(data, codec)
+            encode_ms = (time.perf_counter() - start) / repeat * 1000
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                decode(payload, codec)
+            decode_ms = (time.perf_counter() - start) / repeat * 1000
+        except ImportError as e:
+            print(f"{codec:<22} skipped ({e})")
+            continue
+
+        baseline = baseline or len(payload)
+        print(f"{codec:<22} {len(payload):>10,} {len(payload) / baseline:>7.2f} {encode_ms:>10.2f} {decode_ms:>10.2f}")
+
+
+def main():
+    """Benchmark codecs on a JSON file, or on a synthetic history"""
+    if len(sys.argv) > 1 and not sys.argv[1].isdigit():
+        with open(sys.argv[1], 'r') as f:
+            data = json.load(f)
+        print(f"[INFO] Benchmarking codecs on: {sys.argv[1]}")
+    else:
+        count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+        data = _large_history(count)
+        print(f"[INFO] Benchmarking codecs on a synthetic history of {count} transactions")
+
+    benchmark(data)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Single-pass processing pipeline for user financial data
+Stages are generators over (kind, record) tuples: fetch -> perturb -> project -> aggregate,
+after which the payload is encoded once with output_codecs
+
+Kinds emitted by sources: "account", "transaction", "security", "holding", "metadata".
+Securities must come before the holdings that reference them.
+"""
+
+import random
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterable, Iterator, Tuple
+
+Record = Tuple[str, Dict[str, Any]]
+
+VENDORS = ["Starbucks", "Amazon", "Uber", "Netflix", "Spotify", "McDonald's", "Target", "Walmart", "Gas Station", "Restaurant"]
+STOCK_SYMBOLS = ["AAPL", "GOOGL", "MSFT", "TSLA", "AMZN", "META", "NVDA"]
+
+
+def stable_user_hash(user_id: str) -> int:
+    """Hash a user_id the same way in every process (built-in hash() is salted per run)"""
+    return zlib.crc32(user_id.encode('utf-8'))
+
+
+def raw_records(raw_data: Dict[str, Any]) -> Iterator[Record]:
+    """Stream records out of a raw Plaid dataset without copying it"""
+    # Transactions, accounts, holdings is the order the per-user variation has always been drawn in
+    for transaction in raw_data.get('transactions', []):
+        yield "transaction", transaction
+    for account in raw_data.get('accounts', []):
+        yield "account", account
+    for security in raw_data.get('securities', []):
+        yield "security", security
+    for holding in raw_data.get('holdings', []):
+        yield "holding", holding
+    yield "metadata", raw_data.get('metadata', {})
+
+
+def mock_records(user_id: str) -> Iterator[Record]:
+    """Stream mock raw records for a user (used when Plaid credentials are not available)"""
+    user_hash = stable_user_hash(user_id)
+    # Use user_id as seed for consistent randomization
+    rng = random.Random(user_hash)
+    now = datetime.now()
+
+    accounts = []
+    for i, account_type in enumerate(['checking', 'savings', 'credit']):
+        # Generate unique balance based on user_id
+        base_balance = rng.uniform(1000, 50000)
+        account = {
+            "account_id": f"mock_account_{i+1}_{user_hash % 10000}",
+            "name": f"{account_type.title()} Account",
+            "type": account_type,
+            "subtype": "checking" if account_type == "checking" else "savings" if account_type == "savings" else "credit card",
+            "balances": {
+                "current": round(base_balance, 2),
+                "available": round(base_balance * 0.9, 2) if account_type != "credit" else round(base_balance * 0.8, 2)
+            }
+        }
+        accounts.append(account)
+        yield "account", account
+
+    transaction_count = rng.randint(10, 25)
+    for i in range(transaction_count):
+        vendor = rng.choice(VENDORS)
+        amount = round(rng.uniform(5, 200), 2)
+        yield "transaction", {
+            "transaction_id": f"mock_transaction_{i+1}_{user_hash % 10000}",
+            "account_id": rng.choice(accounts)["account_id"],
+            "amount": amount,
+            "date": (now - timedelta(days=rng.randint(1, 30))).strftime("%Y-%m-%d"),
+            "name": vendor,
+            "merchant_name": vendor,
+            "category": ["Food and Drink", "Transportation", "Entertainment", "Shopping"][rng.randint(0, 3)]
+        }
+
+    symbols = rng.sample(STOCK_SYMBOLS, rng.randint(3, 5))
+    for i, symbol in enumerate(symbols):
+        quantity = rng.uniform(1, 100)
+        price = rng.uniform(50, 500)
+
+        yield "security", {
+            "security_id": f"mock_security_{i+1}",
+            "isin": f"US{symbol}123456",
+            "cusip": f"{symbol}123456",
+            "sedol": f"{symbol}1234",
+            "institution_security_id": f"INST_{symbol}",
+            "institution_id": "mock_institution",
+            "proxy_security_id": None,
+            "name": f"{symbol} Inc.",
+            "ticker_symbol": symbol,
+            "is_cash_equivalent": False,
+            "type": "equity",
+            "close_price": price,
+            "close_price_as_of": now.strftime("%Y-%m-%d"),
+            "iso_currency_code": "USD",
+            "unofficial_currency_code": None
+        }
+        yield "holding", {
+            "account_id": rng.choice(accounts)["account_id"],
+            "security_id": f"mock_security_{i+1}",
+            "institution_price": price,
+            "institution_price_as_of": now.strftime("%Y-%m-%d"),
+            "institution_value": round(quantity * price, 2),
+            "cost_basis": round(quantity * price * rng.uniform(0.8, 1.2), 2),
+            "quantity": round(quantity, 4),
+            "iso_currency_code": "USD",
+            "unofficial_currency_code": None
+        }
+
+    yield "metadata", {
+        "user_id": user_id,
+        "generated_at": now.isoformat(),
+        "data_source": "mock_data",
+        "item_id": f"mock_item_{user_hash % 10000}",
+        "total_accounts": len(accounts),
+        "total_transactions": transaction_count,
+        "total_holdings": len(symbols)
+    }
+
+
+def tally(records: Iterable[Record], counts: Counter) -> Iterator[Record]:
+    """Pass records through, counting them by kind"""
+    for kind, record in records:
+        counts[kind] += 1
+        yield kind, record
+
+
+def annotate(records: Iterable[Record], **fields) -> Iterator[Record]:
+    """Add fields to the metadata record"""
+    for kind, record in records:
+        if kind == "metadata":
+            record.update(fields)
+        yield kind, record
+
+
+def perturb(records: Iterable[Record], seed: int) -> Iterator[Record]:
+    """Apply the per-user random variation to amounts, balances and prices in place"""
+    rng = random.Random(seed)
+    for kind, record in records:
+        if kind == "transaction" and 'amount' in record:
+            record['amount'] = round(record['amount'] * rng.uniform(0.95, 1.05), 2)
+        elif kind == "account" and 'current' in record.get('balances', {}):
+            record['balances']['current'] = round(record['balances']['current'] * rng.uniform(0.98, 1.02), 2)
+        elif kind == "holding" and 'quantity' in record and 'institution_price' in record:
+            record['institution_price'] = round(record['institution_price'] * rng.uniform(0.99, 1.01), 2)
+        yield kind, record
+
+
+def project(records: Iterable[Record]) -> Iterator[Record]:
+    """Reduce raw records to minimal-format records
+
+    Emits "balance" (signed account balance), "transaction" (vendor, cash_flow),
+    "investment" (symbol, quantity, current_value) and "metadata".
+    """
+    securities: Dict[str, Dict[str, Any]] = {}
+    for kind, record in records:
+        if kind == "account":
+            balance = record.get('balances', {}).get('current', 0)
+            # For credit cards, balance represents debt (negative)
+            yield "balance", {"amount": -balance if record.get('type') == 'credit' else balance}
+        elif kind == "transaction":
+            yield "transaction", {
+                "vendor": record.get('merchant_name') or record.get('name', 'Unknown'),
+                # Flip the sign to make expenses negative
+                "cash_flow": -record.get('amount', 0)
+            }
+        elif kind == "security":
+            securities.setdefault(record.get('security_id'), record)
+        elif kind == "holding":
+            security = securities.get(record.get('security_id'), {})
+            symbol = security.get('ticker_symbol', 'N/A')
+            current_value = record.get('institution_value', 0)
+            # Only include investments with actual value and valid symbol
+            if symbol != 'N/A' and current_value > 0:
+                yield "investment", {
+                    "symbol": symbol,
+                    "quantity": record.get('quantity', 0),
+                    "current_value": current_value
+                }
+        elif kind == "metadata":
+            yield kind, record
+
+
+def aggregate(records: Iterable[Record]) -> Dict[str, Any]:
+    """Collect minimal-format records into the payload expected by the API"""
+    result = {
+        "current_balance": 0,
+        "transactions": [],
+        "investments": [],
+        "metadata": {}
+    }
+    for kind, record in records:
+        if kind == "balance":
+            result["current_balance"] += record["amount"]
+        elif kind == "transaction":
+            result["transactions"].append(record)
+        elif kind == "investment":
+            result["investments"].append(record)
+        elif kind == "metadata":
+            result["metadata"] = record
+    return result
@@ -59,6 +59,11 @@ class PlaidClient:
     
     def _get_environment(self) -> Environment:
         """Get Plaid environment based on configuration"""
+        # PLAID_HOST points the client at a local stand-in (see plaid_standin.py)
+        host = os.getenv('PLAID_HOST')
+        if host:
+            return host
+        
         env_map = {
             'sandbox': Environment.Sandbox,
             'development': Environment.Development, 
@@ -263,6 +268,9 @@ class PlaidClient:
             import time
             time.sleep(2)
             
+            # Errors on the calls below leave that section empty rather than failing the whole fetch
+            partial_errors = {}
+            
             transactions_data = self.get_transactions(90)  # Try 90 days instead of 30
             
             # Debug: Check what we actually got
@@ -276,6 +284,7 @@ class PlaidClient:
                     
                     if 'error' in transactions_data:
                         print(f"❌ Still error after retry: {transactions_data['error']}")
+                        partial_errors['transactions'] = self._error_code(transactions_data['error'])
                         transactions_data = {'transactions': []}
                     else:
                         print(f"✅ Found {len(transactions_data.get('transactions', []))} transactions after retry")
@@ -284,7 +293,11 @@ class PlaidClient:
                 # Try with a much longer date range
                 print("🔄 Trying with 365 days...")
                 transactions_data = self.get_transactions(365)
-                if not transactions_data.get('transactions'):
+                if 'error' in transactions_data:
+                    print(f"❌ Error fetching transactions: {transactions_data['error']}")
+                    partial_errors['transactions'] = self._error_code(transactions_data['error'])
+                    transactions_data = {'transactions': []}
+                elif not transactions_data.get('transactions'):
                     print("ℹ️ Still no transactions found")
                     transactions_data = {'transactions': []}
             else:
@@ -294,6 +307,11 @@ class PlaidClient:
             holdings_data = self.get_investment_holdings()
             investment_transactions_data = self.get_investment_transactions(30)
             
+            for section, data in [('transactions', transactions_data), ('holdings', holdings_data),
+                                  ('investment_transactions', investment_transactions_data)]:
+                if 'error' in data:
+                    partial_errors[section] = self._error_code(data['error'])
+            
             # Structure data similar to sample.json
             financial_data = {
                 "accounts": accounts,
@@ -310,6 +328,9 @@ class PlaidClient:
                     "total_holdings": len(holdings_data.get('holdings', []))
                 }
             }
+            # Only error codes are passed on: the metadata reaches the browser
+            if partial_errors:
+                financial_data['metadata']['partial_errors'] = partial_errors
             
             return financial_data
             
@@ -373,11 +394,26 @@ class PlaidClient:
                 }
             }
     
-    def save_data_to_file(self, data: Dict[str, Any], filename: str = 'financial_data.json'):
-        """Save financial data to JSON file"""
+    def _error_code(self, error: Any) -> str:
+        """Reduce an error returned by the methods above to its Plaid error code"""
+        if isinstance(error, dict) and error.get('error_code'):
+            return error['error_code']
+        return 'UNKNOWN_ERROR'
+    
+    def save_data_to_file(self, data: Dict[str, Any], filename: str = 'financial_data.json',
+                          archive_dir: Optional[str] = None, user_id: Optional[str] = None,
+                          codec: str = 'json'):
+        """Save financial data to a file using the given codec, or to the snapshot archive"""
         try:
-            with open(filename, 'w') as f:
-                json.dump(data, f, indent=2, default=str)
+            if archive_dir:
+                from snapshot_archive import SnapshotArchive
+                user_id = user_id or data.get('metadata', {}).get('user_id') or self.item_id or 'default'
+                result = SnapshotArchive(archive_dir).archive(user_id, data)
+                print(f"Data archived to {archive_dir} ({result['transactions']} transactions, {result['partitions']} partitions)")
+                return
+            
+            from output_codecs import write_output
+            write_output(data, filename, codec)
             print(f"Data saved to {filename}")
         except Exception as e:
             print(f"Error saving data: {e}")
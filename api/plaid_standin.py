@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Local Plaid stand-in for load testing
+Serves the sandbox endpoints PlaidClient uses with generated data and configurable latency
+Point PlaidClient at it with PLAID_HOST=http://127.0.0.1:<port>
+"""
+
+import sys
+import json
+import time
+import random
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Tuple
+
+VENDORS = ["Starbucks", "Amazon", "Uber", "Netflix", "Spotify", "McDonald's", "Target", "Walmart"]
+SYMBOLS = ["AAPL", "GOOGL", "MSFT", "TSLA", "AMZN", "META", "NVDA"]
+
+
+def _account(account_id: str, name: str, account_type: str, subtype: str, current: float) -> Dict[str, Any]:
+    return {
+        "account_id": account_id,
+        "balances": {
+            "available": current,
+            "current": current,
+            "limit": None,
+            "iso_currency_code": "USD",
+            "unofficial_currency_code": None,
+            # Required when the investments endpoints return accounts
+            "margin_loan_amount": None
+        },
+        "mask": account_id[-4:],
+        "name": name,
+        "official_name": name,
+        "type": account_type,
+        "subtype": subtype
+    }
+
+
+def _transaction(rng: random.Random, account_id: str, index: int) -> Dict[str, Any]:
+    vendor = rng.choice(VENDORS)
+    return {
+        "transaction_id": f"standin_txn_{index}_{rng.randint(0, 10 ** 9)}",
+        "account_id": account_id,
+        "amount": round(rng.uniform(5, 200), 2),
+        "iso_currency_code": "USD",
+        "unofficial_currency_code": None,
+        "date": (date.today() - timedelta(days=rng.randint(1, 30))).isoformat(),
+        "pending": False,
+        "name": vendor,
+        "merchant_name": vendor,
+        "authorized_date": None,
+        "authorized_datetime": None,
+        "datetime": None,
+        "payment_channel": "in store",
+        "transaction_code": None
+    }
+
+
+def _security(index: int, symbol: str, price: float) -> Dict[str, Any]:
+    return {
+        "security_id": f"standin_security_{index}",
+        "isin": None,
+        "cusip": None,
+        "sedol": None,
+        "institution_security_id": None,
+        "institution_id": None,
+        "proxy_security_id": None,
+        "name": f"{symbol} Inc.",
+        "ticker_symbol": symbol,
+        "is_cash_equivalent": False,
+        "type": "equity",
+        "close_price": price,
+        "close_price_as_of": None,
+        "iso_currency_code": "USD",
+        "unofficial_currency_code": None,
+        "market_identifier_code": None,
+        "sector": None,
+        "industry": None,
+        "cfi_code": None,
+        "figi": None,
+        "option_contract": None,
+        "fixed_income": None
+    }
+
+
+class PlaidStandin:
+    """Generates per-item data and answers Plaid API requests"""
+
+    def __init__(self, latency_ms: float = 50, transactions: int = 20, error_rate: float = 0.0,
+                 max_items: int = 256):
+        """Initialize stand-in with response latency, transaction count and injected error rate
+
+        Items are dropped after /investments/transactions/get, the last call PlaidClient makes
+        for an item. At most max_items are kept for fetches that stop early, oldest evicted
+        first, so the stand-in's memory stays flat when it shares a process with the load test.
+        """
+        self.latency_ms = latency_ms
+        self.transactions = transactions
+        self.error_rate = error_rate
+        self.max_items = max_items
+        self.items: Dict[str, Dict[str, Any]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _item(self, item_id: str) -> Dict[str, Any]:
+        return {
+            "item_id": item_id,
+            "webhook": None,
+            "error": None,
+            "available_products": [],
+            "billed_products": ["transactions", "investments"],
+            "consent_expiration_time": None,
+            "update_type": "background"
+        }
+
+    def _new_item(self) -> str:
+        """Create an item with random accounts, transactions and holdings"""
+        item_id = uuid.uuid4().hex
+        rng = random.Random(item_id)
+        accounts = [
+            _account(f"{item_id}_chk", "Checking", "depository", "checking", round(rng.uniform(1000, 50000), 2)),
+            _account(f"{item_id}_sav", "Savings", "depository", "savings", round(rng.uniform(1000, 50000), 2)),
+            _account(f"{item_id}_cc", "Credit Card", "credit", "credit card", round(rng.uniform(0, 5000), 2)),
+            _account(f"{item_id}_inv", "Brokerage", "investment", "brokerage", round(rng.uniform(1000, 50000), 2))
+        ]
+        transactions = [_transaction(rng, rng.choice(accounts[:3])["account_id"], i) for i in range(self.transactions)]
+
+        securities: List[Dict[str, Any]] = []
+        holdings: List[Dict[str, Any]] = []
+        for i, symbol in enumerate(rng.sample(SYMBOLS, 4)):
+            price = round(rng.uniform(50, 500), 2)
+            quantity = round(rng.uniform(1, 100), 4)
+            securities.append(_security(i, symbol, price))
+            holdings.append({
+                "account_id": accounts[3]["account_id"],
+                "security_id": f"standin_security_{i}",
+                "institution_price": price,
+                "institution_value": round(price * quantity, 2),
+                "cost_basis": round(price * quantity * rng.uniform(0.8, 1.2), 2),
+                "quantity": quantity,
+                "iso_currency_code": "USD",
+                "unofficial_currency_code": None
+            })
+
+        with self.lock:
+            self.items[item_id] = {
+                "accounts": accounts,
+                "transactions": transactions,
+                "holdings": holdings,
+                "securities": securities
+            }
+            while len(self.items) > self.max_items:
+                self.items.popitem(last=False)
+        return item_id
+
+    def handle(self, path: str, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """Answer one API call; returns (status, response body)"""
+        if self.latency_ms:
+            time.sleep(random.expovariate(1000.0 / self.latency_ms))
+        if self.error_rate and random.random() < self.error_rate:
+            return 500, {
+                "error_type": "API_ERROR",
+                "error_code": "INTERNAL_SERVER_ERROR",
+                "error_message": "injected error",
+                "display_message": None,
+                "request_id": uuid.uuid4().hex
+            }
+
+        request_id = uuid.uuid4().hex
+        if path == "/sandbox/public_token/create":
+            return 200, {"public_token": f"public-standin-{self._new_item()}", "request_id": request_id}
+        if path == "/item/public_token/exchange":
+            item_id = body.get("public_token", "").replace("public-standin-", "")
+            return 200, {"access_token": f"access-standin-{item_id}", "item_id": item_id, "request_id": request_id}
+
+        item_id = body.get("access_token", "").replace("access-standin-", "")
+        with self.lock:
+            data = self.items.get(item_id)
+        if data is None:
+            return 400, {
+                "error_type": "INVALID_INPUT",
+                "error_code": "INVALID_ACCESS_TOKEN",
+                "error_message": "unknown access token",
+                "display_message": None,
+                "request_id": request_id
+            }
+
+        item = self._item(item_id)
+        if path == "/accounts/get":
+            return 200, {"accounts": data["accounts"], "item": item, "request_id": request_id}
+        if path == "/transactions/get":
+            return 200, {
+                "accounts": data["accounts"],
+                "transactions": data["transactions"],
+                "total_transactions": len(data["transactions"]),
+                "item": item,
+                "request_id": request_id
+            }
+        if path == "/investments/holdings/get":
+            return 200, {
+                "accounts": data["accounts"],
+                "holdings": data["holdings"],
+                "securities": data["securities"],
+                "item": item,
+                "request_id": request_id
+            }
+        if path == "/investments/transactions/get":
+            with self.lock:
+                self.items.pop(item_id, None)
+            return 200, {
+                "item": item,
+                "accounts": data["accounts"],
+                "securities": data["securities"],
+                "investment_transactions": [],
+                "total_investment_transactions": 0,
+                "request_id": request_id
+            }
+        return 404, {"error_type": "INVALID_REQUEST", "error_code": "NOT_FOUND",
+                     "error_message": f"unknown endpoint {path}", "display_message": None,
+                     "request_id": request_id}
+
+
+def make_server(standin: PlaidStandin, port: int = 0) -> ThreadingHTTPServer:
+    """Create an HTTP server for the stand-in; port 0 picks a free port"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            status, response = standin.handle(self.path, body)
+            payload = json.dumps(response).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_background(standin: PlaidStandin, port: int = 0) -> ThreadingHTTPServer:
+    """Start the stand-in on a daemon thread and return the running server"""
+    server = make_server(standin, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    """Run the stand-in in the foreground"""
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 50
+    server = make_server(PlaidStandin(latency_ms=latency_ms), port)
+    print(f"[INFO] Plaid stand-in listening on http://127.0.0.1:{port} (latency ~{latency_ms} ms)")
+    print(f"   Use: PLAID_HOST=http://127.0.0.1:{port} PLAID_CLIENT_ID=standin PLAID_SECRET=standin")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
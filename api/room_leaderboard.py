@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Room leaderboard scoring engine
+Scores every member of a room in one vectorized pass over a member x metric matrix
+"""
+
+import sys
+import time
+import random
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+# Column order of the member x metric matrix
+METRICS = ["net_cash_flow", "savings_rate", "balance", "investment_value"]
+
+# Relative weight of each metric in the composite score
+DEFAULT_WEIGHTS = {
+    "net_cash_flow": 0.3,
+    "savings_rate": 0.3,
+    "balance": 0.2,
+    "investment_value": 0.2
+}
+
+
+def extract_metric_row(minimal_data: Dict[str, Any]) -> np.ndarray:
+    """Reduce one member's minimal financial data to a row of raw metrics"""
+    cash_flows = np.fromiter(
+        (t.get('cash_flow', 0) for t in minimal_data.get('transactions', [])),
+        dtype=np.float64
+    )
+    income = cash_flows[cash_flows > 0].sum()
+    net_cash_flow = cash_flows.sum()
+
+    # Share of income that was kept; no income means nothing was saved. Clipped to [-1, 1]
+    # so a member with near-zero income can't become an outlier that flattens the column
+    savings_rate = float(np.clip(net_cash_flow / income, -1.0, 1.0)) if income > 0 else 0.0
+
+    investment_value = sum(i.get('current_value', 0) for i in minimal_data.get('investments', []))
+
+    return np.array([
+        net_cash_flow,
+        savings_rate,
+        minimal_data.get('current_balance', 0),
+        investment_value
+    ], dtype=np.float64)
+
+
+class RoomLeaderboard:
+    """Ranks room members by a weighted score over their financial metrics"""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, capacity: int = 16):
+        """Initialize an empty leaderboard"""
+        weights = weights or DEFAULT_WEIGHTS
+        self.weights = np.array([weights.get(m, 0.0) for m in METRICS], dtype=np.float64)
+
+        # Rows past self.size are unused capacity so refreshes and joins don't reallocate
+        self.metrics = np.zeros((capacity, len(METRICS)), dtype=np.float64)
+        self.user_ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.size = 0
+
+        self.scores = np.zeros(0, dtype=np.float64)
+        self.order = np.zeros(0, dtype=np.intp)
+
+    @classmethod
+    def from_room(cls, room_data: Dict[str, Dict[str, Any]],
+                  weights: Optional[Dict[str, float]] = None) -> 'RoomLeaderboard':
+        """Build a leaderboard from a mapping of user_id -> minimal financial data"""
+        board = cls(weights, capacity=max(len(room_data), 1))
+        for user_id, minimal_data in room_data.items():
+            board._set_row(user_id, extract_metric_row(minimal_data))
+        board._rescore()
+        return board
+
+    def _set_row(self, user_id: str, row: np.ndarray):
+        """Write a member's metric row, appending the member if needed"""
+        position = self.index.get(user_id)
+        if position is None:
+            if self.size == len(self.metrics):
+                grown = np.zeros((len(self.metrics) * 2, len(METRICS)), dtype=np.float64)
+                grown[:self.size] = self.metrics[:self.size]
+                self.metrics = grown
+            position = self.size
+            self.index[user_id] = position
+            self.user_ids.append(user_id)
+            self.size += 1
+        self.metrics[position] = row
+
+    def _rescore(self):
+        """Recompute every member's score and the ranking order"""
+        active = self.metrics[:self.size]
+        if self.size == 0:
+            self.scores = np.zeros(0, dtype=np.float64)
+            self.order = np.zeros(0, dtype=np.intp)
+            return
+
+        # Z-score each column so metrics with different units are comparable
+        mean = active.mean(axis=0)
+        std = active.std(axis=0)
+        std[std == 0] = 1.0
+        normalized = (active - mean) / std
+
+        self.scores = normalized @ self.weights
+        # Stable sort keeps ties in join order
+        self.order = np.argsort(-self.scores, kind='stable')
+
+    def update_member(self, user_id: str, minimal_data: Dict[str, Any]):
+        """Re-rank after a single member refreshes (or joins)
+
+        Only the member's row is re-extracted; the matrix is reused in place. Scores are
+        z-scores against the whole room, so one member's change moves every score and the
+        whole room is rescored and re-sorted (one vectorized O(N log N) pass).
+        """
+        self._set_row(user_id, extract_metric_row(minimal_data))
+        self._rescore()
+
+    def remove_member(self, user_id: str):
+        """Drop a member from the leaderboard"""
+        position = self.index.pop(user_id, None)
+        if position is None:
+            return
+
+        # Move the last row into the freed slot to keep the matrix dense
+        last = self.size - 1
+        if position != last:
+            moved_id = self.user_ids[last]
+            self.metrics[position] = self.metrics[last]
+            self.user_ids[position] = moved_id
+            self.index[moved_id] = position
+        self.user_ids.pop()
+        self.size -= 1
+        self._rescore()
+
+    def rank_of(self, user_id: str) -> Optional[int]:
+        """Get a member's 1-based rank"""
+        position = self.index.get(user_id)
+        if position is None:
+            return None
+        return int(np.nonzero(self.order == position)[0][0]) + 1
+
+    def leaderboard(self) -> List[Dict[str, Any]]:
+        """Get the ranked leaderboard, best score first"""
+        ranked = []
+        for rank, position in enumerate(self.order, start=1):
+            row = self.metrics[position]
+            entry = {
+                "rank": rank,
+                "user_id": self.user_ids[position],
+                "score": round(float(self.scores[position]), 4)
+            }
+            for column, metric in enumerate(METRICS):
+                entry[metric] = round(float(row[column]), 4 if metric == "savings_rate" else 2)
+            ranked.append(entry)
+        return ranked
+
+
+def _random_minimal_data(rng: random.Random) -> Dict[str, Any]:
+    """Generate minimal financial data shaped like transform_to_minimal_format output"""
+    vendors = ["Starbucks", "Amazon", "Uber", "Payroll", "Target", "Walmart"]
+    transactions = []
+    for _ in range(rng.randint(10, 60)):
+        vendor = rng.choice(vendors)
+        amount = rng.uniform(1000, 4000) if vendor == "Payroll" else -rng.uniform(5, 200)
+        transactions.append({"vendor": vendor, "cash_flow": round(amount, 2)})
+
+    investments = [
+        {"symbol": symbol, "quantity": round(rng.uniform(1, 100), 4), "current_value": round(rng.uniform(100, 20000), 2)}
+        for symbol in rng.sample(["AAPL", "GOOGL", "MSFT", "TSLA", "AMZN"], rng.randint(0, 4))
+    ]
+
+    return {
+        "current_balance": round(rng.uniform(-20000, 80000), 2),
+        "transactions": transactions,
+        "investments": investments
+    }
+
+
+def benchmark(members: int = 5000, refreshes: int = 200):
+    """Time a full build and single-member refreshes for a large room"""
+    if members < 1:
+        print("[ERROR] Benchmark needs at least one member")
+        return
+
+    rng = random.Random(0)
+    room_data = {f"user_{i}": _random_minimal_data(rng) for i in range(members)}
+
+    start = time.perf_counter()
+    board = RoomLeaderboard.from_room(room_data)
+    board.leaderboard()
+    build_time = time.perf_counter() - start
+
+    user_ids = list(room_data)
+    start = time.perf_counter()
+    for _ in range(refreshes):
+        board.update_member(rng.choice(user_ids), _random_minimal_data(rng))
+    refresh_time = (time.perf_counter() - start) / refreshes
+
+    print(f"[INFO] Members: {members}")
+    print(f"   Full build + rank: {build_time * 1000:.1f} ms")
+    print(f"   Single refresh + re-rank: {refresh_time * 1000:.3f} ms (avg of {refreshes})")
+    print(f"   Leader: {board.leaderboard()[0]['user_id']}")
+
+
+def main():
+    """Run the leaderboard benchmark"""
+    members = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    benchmark(members)
+
+
+if __name__ == "__main__":
+    main()
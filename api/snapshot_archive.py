@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Columnar archive of per-user financial snapshots and transactions
+Stores Arrow IPC files partitioned by user and month and queries them through memory maps
+"""
+
+import sys
+import os
+import re
+import tempfile
+from datetime import date, datetime
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Union
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from pipeline import Record
+
+TRANSACTIONS_SCHEMA = pa.schema([
+    ("transaction_id", pa.string()),
+    ("account_id", pa.string()),
+    ("date", pa.date32()),
+    ("vendor", pa.string()),
+    ("cash_flow", pa.float64())
+])
+
+SNAPSHOTS_SCHEMA = pa.schema([
+    ("generated_at", pa.timestamp("us")),
+    ("current_balance", pa.float64()),
+    ("investment_value", pa.float64()),
+    ("total_transactions", pa.int64()),
+    ("item_id", pa.string())
+])
+
+DateLike = Union[str, date]
+
+
+def _to_date(value: Any) -> date:
+    """Parse a Plaid date (date object or YYYY-MM-DD string)"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _month_key(value: date) -> str:
+    """Partition key for a date"""
+    return f"{value.year:04d}-{value.month:02d}"
+
+
+def _safe_user_id(user_id: str) -> str:
+    """Make a user id safe to use as a directory name"""
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', user_id)
+
+
+def _window_start(table: pa.Table) -> Optional[date]:
+    """Earliest date the generation that wrote a transactions file fetched"""
+    value = (table.schema.metadata or {}).get(b'window_start')
+    return date.fromisoformat(value.decode('utf-8')) if value else None
+
+
+class SnapshotArchive:
+    """Append-only Arrow IPC archive partitioned as <root>/<user>/<YYYY-MM>/"""
+
+    def __init__(self, root: str):
+        """Initialize archive rooted at the given directory"""
+        self.root = root
+
+    def _partition_dir(self, user_id: str, month: str) -> str:
+        """Directory holding one user's files for one month"""
+        return os.path.join(self.root, _safe_user_id(user_id), month)
+
+    def _write(self, user_id: str, month: str, kind: str, table: pa.Table, stamp: str):
+        """Write one immutable IPC file into a partition"""
+        directory = self._partition_dir(user_id, month)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{kind}-{stamp}.arrow")
+        # A temp file per writer, so concurrent generations can't replace each other's
+        handle, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        os.close(handle)
+        with pa.OSFile(temp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(temp_path, path)
+
+    def archive(self, user_id: str, raw_data: Dict[str, Any]) -> Dict[str, int]:
+        """Archive a raw Plaid dataset: one snapshot row plus its transactions"""
+        metadata = raw_data.get('metadata', {})
+        generated_at = metadata.get('generated_at') or metadata.get('fetch_date')
+        generated_at = datetime.fromisoformat(generated_at) if generated_at else datetime.now()
+        stamp = generated_at.strftime('%Y%m%dT%H%M%S%f')
+
+        # Split transactions by month so each lands in its own partition
+        by_month: Dict[str, Dict[str, list]] = {}
+        window_start = generated_at.date()
+        for transaction in raw_data.get('transactions', []):
+            transaction_date = _to_date(transaction.get('date') or generated_at)
+            window_start = min(window_start, transaction_date)
+            columns = by_month.setdefault(_month_key(transaction_date), {name: [] for name in TRANSACTIONS_SCHEMA.names})
+            columns['transaction_id'].append(transaction.get('transaction_id'))
+            columns['account_id'].append(transaction.get('account_id'))
+            columns['date'].append(transaction_date)
+            columns['vendor'].append(transaction.get('merchant_name') or transaction.get('name', 'Unknown'))
+            columns['cash_flow'].append(-transaction.get('amount', 0))
+
+        # Readers use the window start to tell which older rows this generation supersedes
+        schema = TRANSACTIONS_SCHEMA.with_metadata({"window_start": window_start.isoformat()})
+        for month, columns in by_month.items():
+            table = pa.Table.from_pydict(columns, schema=schema)
+            self._write(user_id, month, "transactions", table, stamp)
+
+        total_balance = 0
+        for account in raw_data.get('accounts', []):
+            balance = account.get('balances', {}).get('current', 0) or 0
+            total_balance += -balance if account.get('type') == 'credit' else balance
+
+        snapshot = pa.Table.from_pydict({
+            "generated_at": [generated_at.replace(tzinfo=None)],
+            "current_balance": [float(total_balance)],
+            "investment_value": [float(sum(h.get('institution_value', 0) or 0 for h in raw_data.get('holdings', [])))],
+            "total_transactions": [len(raw_data.get('transactions', []))],
+            "item_id": [metadata.get('item_id')]
+        }, schema=SNAPSHOTS_SCHEMA)
+        self._write(user_id, _month_key(generated_at.date()), "snapshots", snapshot, stamp)
+
+        return {"snapshots": 1, "transactions": len(raw_data.get('transactions', [])), "partitions": len(by_month)}
+
+    def _partition_files(self, user_id: str, kind: str,
+                         start: Optional[date], end: Optional[date]) -> Dict[str, List[str]]:
+        """Files of one kind in each partition overlapping [start, end], oldest generation first"""
+        user_dir = os.path.join(self.root, _safe_user_id(user_id))
+        if not os.path.isdir(user_dir):
+            return {}
+
+        low = _month_key(start) if start else None
+        high = _month_key(end) if end else None
+
+        partitions = {}
+        for month in sorted(os.listdir(user_dir)):
+            # Month keys sort lexically, so partitions are pruned without opening them
+            if (low and month < low) or (high and month > high):
+                continue
+            directory = os.path.join(user_dir, month)
+            # File names end in the generation stamp, so name order is generation order
+            partitions[month] = [
+                os.path.join(directory, filename) for filename in sorted(os.listdir(directory))
+                if filename.startswith(f"{kind}-") and filename.endswith(".arrow")
+            ]
+        return partitions
+
+    @staticmethod
+    def _open(path: str) -> pa.Table:
+        """Memory-map one IPC file"""
+        return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+    def _read_transactions(self, user_id: str, start: Optional[date], end: Optional[date]) -> pa.Table:
+        """Read each day of the partitions overlapping [start, end] from the newest generation covering it
+
+        Every generation re-fetches its whole window, so a newer file supersedes older rows from
+        the days it covered, including transactions that have since been removed. Older files
+        only contribute days before that window, and are not opened once the month is covered.
+        """
+        tables = []
+        for month, paths in self._partition_files(user_id, "transactions", start, end).items():
+            month_start = date(int(month[:4]), int(month[5:7]), 1)
+            covered_from = None
+            for path in reversed(paths):
+                table = self._open(path)
+                window_start = _window_start(table) or month_start
+                if covered_from is not None:
+                    table = table.filter(pc.less(table['date'], pa.scalar(covered_from, pa.date32())))
+                tables.append(table.replace_schema_metadata(None))
+                covered_from = window_start if covered_from is None else min(covered_from, window_start)
+                if covered_from <= month_start:
+                    break
+
+        if not tables:
+            return TRANSACTIONS_SCHEMA.empty_table()
+        return pa.concat_tables(tables)
+
+    def query_transactions(self, user_id: str, start: Optional[DateLike] = None,
+                           end: Optional[DateLike] = None,
+                           vendors: Optional[List[str]] = None) -> pa.Table:
+        """Get a user's transactions within [start, end], optionally limited to some vendors"""
+        start = _to_date(start) if start else None
+        end = _to_date(end) if end else None
+        table = self._read_transactions(user_id, start, end)
+
+        mask = None
+        if start:
+            mask = pc.greater_equal(table['date'], pa.scalar(start, pa.date32()))
+        if end:
+            upper = pc.less_equal(table['date'], pa.scalar(end, pa.date32()))
+            mask = upper if mask is None else pc.and_(mask, upper)
+        if vendors:
+            by_vendor = pc.is_in(table['vendor'], value_set=pa.array(vendors, pa.string()))
+            mask = by_vendor if mask is None else pc.and_(mask, by_vendor)
+
+        return table if mask is None else table.filter(mask)
+
+    def query_snapshots(self, user_id: str, start: Optional[DateLike] = None,
+                        end: Optional[DateLike] = None) -> pa.Table:
+        """Get a user's snapshots generated within [start, end], oldest first"""
+        start = _to_date(start) if start else None
+        end = _to_date(end) if end else None
+        tables = [self._open(path) for paths in self._partition_files(user_id, "snapshots", start, end).values()
+                  for path in paths]
+        table = pa.concat_tables(tables) if tables else SNAPSHOTS_SCHEMA.empty_table()
+
+        day = pc.cast(table['generated_at'], pa.date32())
+        mask = None
+        if start:
+            mask = pc.greater_equal(day, pa.scalar(start, pa.date32()))
+        if end:
+            upper = pc.less_equal(day, pa.scalar(end, pa.date32()))
+            mask = upper if mask is None else pc.and_(mask, upper)
+
+        table = table if mask is None else table.filter(mask)
+        return table.sort_by('generated_at')
+
+
+def archive_records(records: Iterable[Record], archive: SnapshotArchive, user_id: str) -> Iterator[Record]:
+    """Pass raw records through, archiving them as one generation once the stream ends"""
+    raw_data: Dict[str, Any] = {"accounts": [], "transactions": [], "holdings": [], "metadata": {}}
+    for kind, record in records:
+        if kind in ("account", "transaction", "holding"):
+            raw_data[f"{kind}s"].append(record)
+        elif kind == "metadata":
+            raw_data["metadata"] = record
+        yield kind, record
+    archive.archive(user_id, raw_data)
+
+
+def main():
+    """Query archived transactions for a user"""
+    if len(sys.argv) < 3:
+        print("Usage: python snapshot_archive.py <archive_dir> <user_id> [start_date] [end_date] [vendor ...]")
+        sys.exit(1)
+
+    archive = SnapshotArchive(sys.argv[1])
+    user_id = sys.argv[2]
+    start = sys.argv[3] if len(sys.argv) > 3 else None
+    end = sys.argv[4] if len(sys.argv) > 4 else None
+    vendors = sys.argv[5:] or None
+
+    transactions = archive.query_transactions(user_id, start, end, vendors)
+    snapshots = archive.query_snapshots(user_id, start, end)
+
+    print(f"[INFO] {snapshots.num_rows} snapshots, {transactions.num_rows} transactions for user: {user_id}")
+    for row in transactions.sort_by('date').to_pylist():
+        print(f"   {row['date']}  {row['vendor']:<25} {row['cash_flow']:>10,.2f}")
+
+
+if __name__ == "__main__":
+    main()
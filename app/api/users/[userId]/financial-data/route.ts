@@ -19,9 +19,28 @@ interface FinancialData {
     user_id: string;
     generated_at: string;
     item_id: string;
+    aggregates?: {
+      income: number;
+      expenses: number;
+      net_cash_flow: number;
+    };
   };
 }
 
+interface VersionedResponse {
+  status: 'not_modified' | 'delta' | 'full';
+  version: string;
+  base_version?: string;
+  data?: FinancialData;
+  changes?: Partial<FinancialData> & {
+    transactions_delta?: {
+      added: FinancialData['transactions'];
+      removed: FinancialData['transactions'];
+    };
+  };
+  metadata?: FinancialData['metadata'];
+}
+
 export async function POST(request: NextRequest, { params }: { params: Promise<{ userId: string }> }) {
   try {
     const { userId } = await params;
@@ -35,16 +54,38 @@ export async function POST(request: NextRequest, { params }: { params: Promise<{
 
     console.log(`🔄 Generating financial data for user: ${userId}`);
 
-    // Generate unique filename for this user
+    // Generate unique filename for this user. The file is parsed with JSON.parse, so ask for
+    // compact JSON; the msgpack and zstd codecs are meant for non-Node consumers
+    const outputFormat = 'compact-json';
     const timestamp = Date.now();
     const filename = `user_${userId}_${timestamp}_financial_data.json`;
     const filepath = path.join(process.cwd(), 'api', filename);
 
     // Call Python script to generate Plaid sandbox data
     const pythonScript = path.join(process.cwd(), 'api', 'generate_user_financial_data.py');
+    const stateDir = path.join(process.cwd(), 'api', '.versions');
+    const aggregateDir = path.join(process.cwd(), 'api', '.aggregates');
+    const archiveDir = path.join(process.cwd(), 'api', '.archive');
+    const args = [
+      pythonScript, userId, filepath,
+      '--format', outputFormat,
+      '--state-dir', stateDir,
+      '--aggregate-dir', aggregateDir,
+      '--archive-dir', archiveDir
+    ];
+
+    // ETag-style revalidation: the caller sends back the versions it already has. The header
+    // is a comma-separated list of tags, each possibly weak (W/"abc"); versions never contain commas
+    const knownVersions = (request.headers.get('if-none-match') ?? '')
+      .split(',')
+      .map((tag) => tag.trim().replace(/^W\//, '').replace(/^"(.*)"$/, '$1'))
+      .filter((tag) => tag && tag !== '*');
+    for (const knownVersion of knownVersions) {
+      args.push('--known-version', knownVersion);
+    }
     
     return new Promise<NextResponse>((resolve) => {
-      const pythonProcess = spawn('python', [pythonScript, userId, filepath], {
+      const pythonProcess = spawn('python', args, {
         cwd: path.join(process.cwd(), 'api'),
         stdio: ['pipe', 'pipe', 'pipe']
       });
@@ -68,16 +109,36 @@ export async function POST(request: NextRequest, { params }: { params: Promise<{
         if (code === 0) {
           // Read the generated file
           try {
-            const financialData: FinancialData = JSON.parse(fs.readFileSync(filepath, 'utf8'));
+            const versioned: VersionedResponse = JSON.parse(fs.readFileSync(filepath, 'utf8'));
 
             // Clean up the temporary file
             fs.unlinkSync(filepath);
 
+            const headers = { ETag: `"${versioned.version}"` };
+
+            if (versioned.status === 'not_modified') {
+              resolve(new NextResponse(null, { status: 304, headers }));
+              return;
+            }
+
+            if (versioned.status === 'delta') {
+              resolve(NextResponse.json({
+                success: true,
+                version: versioned.version,
+                base_version: versioned.base_version,
+                changes: versioned.changes,
+                metadata: versioned.metadata,
+                message: `Financial data changes generated for user ${userId}`
+              }, { headers }));
+              return;
+            }
+
             resolve(NextResponse.json({
               success: true,
-              data: financialData,
+              version: versioned.version,
+              data: versioned.data,
               message: `Financial data generated successfully for user ${userId}`
-            }));
+            }, { headers }));
           } catch (fileError) {
             console.error('Error reading generated file:', fileError);
             resolve(NextResponse.json(